@@ -3,6 +3,7 @@ import src.config as config
 import sys
 from typing import TYPE_CHECKING
 from src.helper.sleep import sleep
+from src.helper.event import Event
 
 if TYPE_CHECKING:
     from typing import Optional
@@ -57,14 +58,30 @@ class Intercom:
     }
     """
 
-    def __init__(self, restart_after_seconds: int = 172800, ota_callback=None) -> None:
-        self.running: bool = False
-        self.start_time: Optional[float] = None
-        self.restart_after_seconds: int = restart_after_seconds
+    # Settings accepted on the config topic, with the exact JSON type each must have
+    _CONFIG_KEYS = (("auto_unlock", bool), ("restart_after_seconds", int))
+
+    def __init__(
+        self, restart_after_seconds: int = 172800, ota_callback=None, time_fn=time.time
+    ) -> None:
+        # Single clock source for timestamps, debounce and restart checks;
+        # time_fn lets tests inject a fake clock without patching time.time
+        self._clock = time_fn
+        self._run_flag = Event()
+        # Set by stop() and incoming MQTT messages to cut the idle wait short
+        self._wake = Event()
+        # Set by stop() to end a WiFi retry backoff early
+        self._net_wake = Event()
+        self._wifi_backoff: float = config.WIFI_RETRY_MIN_SECONDS
+        self._start_time: Optional[float] = None
+        self._restart_after_seconds: int = restart_after_seconds
+        self._restart_deadline: Optional[float] = None
         self.auto_unlock: bool = False
         self._last_call_detected_time: float = 0
-        self._previous_call_state: bool = False
+        self._call_state: int = 0  # Bit 0: call line reading from the previous cycle
         self.ota_callback = ota_callback  # Optional callback for OTA trigger
+        # Read once: nothing changes CALL_DEBOUNCE_SECONDS at runtime
+        self._debounce_sec: float = config.CALL_DEBOUNCE_SECONDS
 
         print("Loading the drivers")
         from src.driver.driver_manager import DriverManager
@@ -75,6 +92,39 @@ class Intercom:
         self.wifi_driver: WifiDriverInterface = driver_manager.load_wifi_driver()
         self.mqtt_driver: MqttDriverInterface = driver_manager.load_mqtt_driver()
 
+    @property
+    def running(self) -> bool:
+        return self._run_flag.is_set()
+
+    @property
+    def start_time(self) -> "Optional[float]":
+        return self._start_time
+
+    @start_time.setter
+    def start_time(self, value: "Optional[float]") -> None:
+        self._start_time = value
+        self._update_restart_deadline()
+
+    @property
+    def restart_after_seconds(self) -> int:
+        return self._restart_after_seconds
+
+    @restart_after_seconds.setter
+    def restart_after_seconds(self, value: int) -> None:
+        self._restart_after_seconds = value
+        self._update_restart_deadline()
+
+    def _update_restart_deadline(self) -> None:
+        """Precompute the restart timestamp so the main loop does a single compare.
+
+        Recomputed whenever start_time or restart_after_seconds changes, e.g. when
+        a new restart threshold arrives via the MQTT config topic.
+        """
+        if self._start_time is None:
+            self._restart_deadline = None
+        else:
+            self._restart_deadline = self._start_time + self._restart_after_seconds
+
     def run(self) -> None:
         """Start the main intercom control loop.
 
@@ -93,19 +143,25 @@ class Intercom:
 
         The loop can be stopped by calling stop() or by reaching the restart threshold.
         """
-        self.running = True
-        self.start_time = time.time()
-
-        while self.running:
+        self._run_flag.set()
+        self._wake.clear()
+        self._net_wake.clear()
+        self._wifi_backoff = config.WIFI_RETRY_MIN_SECONDS
+        self.start_time = self._clock()
+
+        # The restart rule lives in the loop condition: one compare against the
+        # deadline that _update_restart_deadline() precomputes
+        while self._run_flag.is_set() and self._clock() < self._restart_deadline:
             try:
-                if self._should_restart():
-                    self._restart()
-                    # for testing purposes
-                    break
-
                 if not self._ensure_wifi_connected():
-                    sleep(1)  # Prevent CPU spinning on connection failures
+                    # Back off exponentially between attempts; stop() cuts it short
+                    self._net_wake.wait(self._wifi_backoff)
+                    self._net_wake.clear()
+                    self._wifi_backoff = min(
+                        self._wifi_backoff * 2, config.WIFI_RETRY_MAX_SECONDS
+                    )
                     continue
+                self._wifi_backoff = config.WIFI_RETRY_MIN_SECONDS
 
                 if not self._ensure_mqtt_connected():
                     sleep(1)  # Prevent CPU spinning on connection failures
@@ -116,12 +172,18 @@ class Intercom:
                 self._process_cycle()
 
             except Exception as e:
-                print(f"[{time.time()}] Error in main loop: {e}")
+                print(f"[{self._clock()}] Error in main loop: {e}")
                 # Continue running - the ensure methods will handle reconnection
                 sleep(1)  # Brief pause before retrying to avoid rapid error loops
+        else:
+            # Still flagged as running, so the loop ended on the uptime threshold
+            if self._run_flag.is_set():
+                self._restart()
 
     def stop(self) -> None:
-        self.running = False
+        self._run_flag.clear()
+        self._wake.set()
+        self._net_wake.set()
 
     def _ensure_wifi_connected(self) -> bool:
         """Ensure WiFi connection is established.
@@ -134,11 +196,11 @@ class Intercom:
         if self.wifi_driver.is_connected():
             return True
 
-        print(f"[{time.time()}] WiFi not connected, attempting to connect...")
+        print(f"[{self._clock()}] WiFi not connected, attempting to connect...")
         if self._connect_wifi():
             return True
 
-        print(f"[{time.time()}] WiFi connection failed, retrying...")
+        print(f"[{self._clock()}] WiFi connection failed, retrying...")
         return False
 
     def _ensure_mqtt_connected(self) -> bool:
@@ -153,11 +215,11 @@ class Intercom:
         if self.mqtt_driver.is_connected():
             return True
 
-        print(f"[{time.time()}] MQTT not connected, attempting to connect...")
+        print(f"[{self._clock()}] MQTT not connected, attempting to connect...")
         if self._connect_mqtt():
             return True
 
-        print(f"[{time.time()}] MQTT connection failed, retrying...")
+        print(f"[{self._clock()}] MQTT connection failed, retrying...")
         return False
 
     def _connect_wifi(self) -> bool:
@@ -204,29 +266,32 @@ class Intercom:
         }
         """
         print(f"Received config on '{topic}': {message}")
+        self._wake.set()
 
         try:
             import json
 
             config_data = json.loads(message)
 
-            # Update auto_unlock if present
-            if "auto_unlock" in config_data:
-                self.auto_unlock = bool(config_data["auto_unlock"])
-                print(f"Config: auto_unlock set to {self.auto_unlock}")
+            # Validate every key before applying any, so a bad message changes nothing
+            updates = []
+            for key, kind in self._CONFIG_KEYS:
+                value = config_data.get(key)
+                if value is None:
+                    continue
+                if type(value) is not kind:
+                    raise TypeError(f"{key} must be {kind.__name__}, got {value}")
+                updates.append((key, value))
 
-            # Update restart_after_seconds if present
-            if "restart_after_seconds" in config_data:
-                self.restart_after_seconds = int(config_data["restart_after_seconds"])
-                print(
-                    f"Config: restart_after_seconds set to {self.restart_after_seconds} seconds"
-                )
+            for key, value in updates:
+                setattr(self, key, value)
+                print(f"Config: {key} set to {value}")
 
             print(f"Configuration updated successfully")
 
         except ValueError as e:
             print(f"Error parsing config JSON: {e}")
-        except (KeyError, TypeError) as e:
+        except (AttributeError, KeyError, TypeError) as e:
             print(f"Error processing config data: {e}")
 
     def _handle_unlock_message(self, topic: str, message: str) -> None:
@@ -240,14 +305,15 @@ class Intercom:
             message (str): The message payload
         """
         print(
-            f"[{time.time()}] Debug: Received unlock message on '{topic}': '{message}'"
+            f"[{self._clock()}] Debug: Received unlock message on '{topic}': '{message}'"
         )
+        self._wake.set()
 
         if message == config.DOOR_UNLOCKED_MESSAGE:
-            print(f"[{time.time()}] Manual unlock requested via MQTT")
+            print(f"[{self._clock()}] Manual unlock requested via MQTT")
             self._execute_unlock_sequence()
         else:
-            print(f"[{time.time()}] Invalid unlock message received")
+            print(f"[{self._clock()}] Invalid unlock message received")
 
     def _restart(self) -> None:
         print("Uptime threshold reached, restarting esp8266....")
@@ -261,12 +327,6 @@ class Intercom:
             )
         self.stop()
 
-    def _should_restart(self) -> bool:
-        if self.start_time is None:
-            return False
-        uptime: float = time.time() - self.start_time
-        return uptime >= self.restart_after_seconds
-
     def _process_call_detection(self) -> None:
         """Process intercom call detection with edge detection.
 
@@ -274,91 +334,87 @@ class Intercom:
         continuous triggering during a single call event.
         Includes debouncing logic to prevent multiple messages for the same call.
         """
-        current_call_detected = self.gpio_driver.detect_call()
-
-        # Only process if this is a NEW call detection (edge detection)
-        if (
-            not current_call_detected
-            or current_call_detected == self._previous_call_state
-        ):
-            self._previous_call_state = current_call_detected
-            return
+        current = 1 if self.gpio_driver.detect_call() else 0
 
-        # This is a rising edge: False -> True
-        self._previous_call_state = current_call_detected
+        # Only process if this is a NEW call detection (edge detection):
+        # bit 0 of _call_state holds the previous reading, so this is False -> True
+        rising = current & ~self._call_state & 1
+        self._call_state = current
+        if not rising:
+            return
 
-        current_time = time.time()
+        current_time = self._clock()
         time_since_last_call = current_time - self._last_call_detected_time
 
         print(
-            f"[{time.time()}] Debug: NEW call detected! Current time: {current_time}, Last call: {self._last_call_detected_time}, Diff: {time_since_last_call}"
+            f"[{self._clock()}] Debug: NEW call detected! Current time: {current_time}, Last call: {self._last_call_detected_time}, Diff: {time_since_last_call}"
         )
         print(
-            f"[{time.time()}] DEBUG: Using edge detection + {config.CALL_DEBOUNCE_SECONDS}s debounce"
+            f"[{self._clock()}] DEBUG: Using edge detection + {self._debounce_sec}s debounce"
         )
         print(
-            f"[{time.time()}] Debug condition check: {time_since_last_call} > {config.CALL_DEBOUNCE_SECONDS} = {time_since_last_call > config.CALL_DEBOUNCE_SECONDS}"
+            f"[{self._clock()}] Debug condition check: {time_since_last_call} > {self._debounce_sec} = {time_since_last_call > self._debounce_sec}"
         )
 
         # Use debounce to prevent double unlocks
-        if time_since_last_call > config.CALL_DEBOUNCE_SECONDS:
+        if time_since_last_call > self._debounce_sec:
             # Update debounce timer immediately to prevent rapid repeated calls
             self._last_call_detected_time = current_time
 
-            print(f"[{time.time()}] Call detected! Publishing to MQTT...")
+            print(f"[{self._clock()}] Call detected! Publishing to MQTT...")
             # Ensure MQTT is still connected before publishing
             if self.mqtt_driver.is_connected():
                 self.mqtt_driver.publish(
                     config.CALL_DETECTED_TOPIC, config.CALL_DETECTED_MESSAGE
                 )
                 print(
-                    f"[{time.time()}] Call published, next call allowed after: {current_time + config.CALL_DEBOUNCE_SECONDS}"
+                    f"[{self._clock()}] Call published, next call allowed after: {current_time + self._debounce_sec}"
                 )
             else:
                 print(
-                    f"[{time.time()}] MQTT not connected, cannot publish call detection"
+                    f"[{self._clock()}] MQTT not connected, cannot publish call detection"
                 )
 
             # Check if auto_unlock is enabled
             if self.auto_unlock:
                 print(
-                    f"[{time.time()}] Auto-unlock enabled, executing unlock sequence..."
+                    f"[{self._clock()}] Auto-unlock enabled, executing unlock sequence..."
                 )
                 self._execute_unlock_sequence()
         else:
             print(
-                f"[{time.time()}] Call ignored (debounce): {(config.CALL_DEBOUNCE_SECONDS - time_since_last_call):.1f}s remaining"
+                f"[{self._clock()}] Call ignored (debounce): {(self._debounce_sec - time_since_last_call):.1f}s remaining"
             )
 
     def _execute_unlock_sequence(self) -> None:
         """Execute the door unlock sequence with error handling."""
         try:
-            print(f"[{time.time()}] Starting door unlock sequence...")
+            print(f"[{self._clock()}] Starting door unlock sequence...")
             self.gpio_driver.open_conversation()
             sleep(config.CONVERSATION_OPEN_DELAY_SECONDS)
             self.gpio_driver.unlock()
             sleep(config.DOOR_UNLOCK_DURATION_SECONDS)
             self.gpio_driver.close_conversation()
             self.gpio_driver.lock()
-            print(f"[{time.time()}] Door unlock sequence completed successfully")
+            print(f"[{self._clock()}] Door unlock sequence completed successfully")
         except Exception as e:
-            print(f"[{time.time()}] Error during door unlock sequence: {e}")
+            print(f"[{self._clock()}] Error during door unlock sequence: {e}")
             # Attempt to ensure door is locked and conversation closed on error
             # Try each operation independently for maximum safety
             try:
                 self.gpio_driver.close_conversation()
-                print(f"[{time.time()}] Emergency: Conversation closed after error")
+                print(f"[{self._clock()}] Emergency: Conversation closed after error")
             except Exception as close_error:
                 print(
-                    f"[{time.time()}] Critical: Failed to close conversation after error: {close_error}"
+                    f"[{self._clock()}] Critical: Failed to close conversation after error: {close_error}"
                 )
 
             try:
                 self.gpio_driver.lock()
-                print(f"[{time.time()}] Emergency: Door locked after error")
+                print(f"[{self._clock()}] Emergency: Door locked after error")
             except Exception as lock_error:
                 print(
-                    f"[{time.time()}] Critical: Failed to lock door after error: {lock_error}"
+                    f"[{self._clock()}] Critical: Failed to lock door after error: {lock_error}"
                 )
 
     def _process_cycle(self) -> None:
@@ -366,8 +422,10 @@ class Intercom:
         self._process_call_detection()
 
         # Check for pending MQTT messages
-        if hasattr(self.mqtt_driver, "check_messages"):
-            self.mqtt_driver.check_messages()
+        self.mqtt_driver.check_messages()
 
-        # Sleep to prevent CPU spinning and allow system tasks to run
-        sleep(0.1)
+        # Idle to prevent CPU spinning and allow system tasks to run. With
+        # threading, stop() from another thread ends the wait early; on the
+        # ESP8266 the fallback Event makes this a plain sleep(0.1) via the helper
+        self._wake.wait(0.1)
+        self._wake.clear()
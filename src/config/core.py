@@ -7,6 +7,11 @@ MOCK_SLEEP = False
 CALL_DEBOUNCE_SECONDS = 10  # Minimum seconds between processing consecutive calls
 CONVERSATION_OPEN_DELAY_SECONDS = 1  # Delay between opening conversation and unlocking door
 DOOR_UNLOCK_DURATION_SECONDS = 5  # How long the door stays unlocked for entry
+WIFI_RETRY_MIN_SECONDS = 1  # First backoff delay after a failed WiFi connect
+# Backoff cap. On the ESP8266 the 20s watchdog is only fed once WiFi and MQTT are
+# up, and each connect() blocks up to 15s, so a watchdog reset replaces the backoff
+# after its first step there; the cap only applies where no watchdog is armed
+WIFI_RETRY_MAX_SECONDS = 16
 
 IN = 0
 OUT = 1
@@ -1,4 +1,4 @@
-from src.interfaces.mqtt_driver import MqttDriverInterface
+from src.interfaces.mqtt_driver import MqttDriverInterface, MqttError
 import time
 
 class Esp8266MQTTDriver(MqttDriverInterface):
@@ -88,7 +88,7 @@ class Esp8266MQTTDriver(MqttDriverInterface):
     def publish(self, topic: str, payload: str, retain: bool = False):
         """Publish a message to a specific topic."""
         if not self.connected or not self.client:
-            raise Exception("Not connected to MQTT broker")
+            raise MqttError("Not connected to MQTT broker")
 
         try:
             print(f"[{time.time()}] 📤 Publishing to '{topic}': {payload}")
@@ -102,7 +102,7 @@ class Esp8266MQTTDriver(MqttDriverInterface):
     def subscribe(self, topic: str, callback=None):
         """Subscribe to a specific topic."""
         if not self.connected or not self.client:
-            raise Exception("Not connected to MQTT broker")
+            raise MqttError("Not connected to MQTT broker")
 
         try:
             print(f"[{time.time()}] 📡 Subscribing to topic '{topic}'")
@@ -120,7 +120,7 @@ class Esp8266MQTTDriver(MqttDriverInterface):
     def unsubscribe(self, topic: str):
         """Unsubscribe from a topic"""
         if not self.connected or not self.client:
-            raise Exception("Not connected to MQTT broker")
+            raise MqttError("Not connected to MQTT broker")
 
         try:
             self.client.unsubscribe(topic)
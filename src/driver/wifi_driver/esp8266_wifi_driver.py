@@ -27,8 +27,8 @@ class Esp8266WifiDriver(WifiDriverInterface):
         """Disable the Wi-Fi Access Point interface to save power"""
         self.ap_if.active(False)
 
-    def connect(self, ssid: str, password: str) -> bool:
-        """Connect to WiFi network with timeout and retry logic"""
+    def connect(self, ssid: str, password: str, timeout: int = 15) -> bool:
+        """Connect to WiFi network, polling once per second for up to `timeout` seconds"""
         if not self.sta_if:
             print(f"[{time.time()}] Error: WiFi interface not available")
             return False
@@ -45,7 +45,6 @@ class Esp8266WifiDriver(WifiDriverInterface):
 
             self.sta_if.connect(ssid, password)
 
-            timeout = 15
             while not self.sta_if.isconnected() and timeout > 0:
                 print(".", end="")
                 sleep(1)
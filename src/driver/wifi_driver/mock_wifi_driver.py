@@ -4,7 +4,7 @@ class MockWifiDriver(WifiDriverInterface):
     def __init__(self):
         self._connected = False
 
-    def connect(self, ssid: str, password: str) -> bool:
+    def connect(self, ssid: str, password: str, timeout: int = 15) -> bool:
         """Simulate connecting to a WiFi network."""
         print(f"MockWifiDriver: Connecting to SSID: {ssid}")
         print(f"MockWifiDriver: Connected successfully!")
@@ -0,0 +1,34 @@
+try:
+    from threading import Event
+except ImportError:
+    from src.helper.sleep import sleep
+
+    class Event:
+        """
+        Minimal stand-in for threading.Event on ports without threading (ESP8266).
+
+        Without threads nothing can set the flag while wait() is blocked, so a
+        timed wait is a plain sleep followed by one flag check. Polling would only
+        add wake-ups, and time.time() has whole-second resolution on the port.
+        The sleep goes through the helper so MOCK_SLEEP applies here too.
+        """
+
+        def __init__(self) -> None:
+            self._flag = False
+
+        def is_set(self) -> bool:
+            return self._flag
+
+        def set(self) -> None:
+            self._flag = True
+
+        def clear(self) -> None:
+            self._flag = False
+
+        def wait(self, timeout: float = None) -> bool:
+            if self._flag:
+                return True
+            if timeout is None:
+                raise RuntimeError("wait() without timeout on an unset Event would block forever")
+            sleep(timeout)
+            return self._flag
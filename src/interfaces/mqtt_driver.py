@@ -1,5 +1,11 @@
 from .base import ABC, abstractmethod
 
+
+class MqttError(Exception):
+    """Raised by MQTT drivers when an operation can't be performed."""
+    pass
+
+
 class MqttDriverInterface(ABC):
     def __init__(
         self,
@@ -45,3 +51,7 @@ class MqttDriverInterface(ABC):
     def is_connected(self) -> bool:
         """Check if currently connected to the MQTT broker."""
         pass
+
+    def check_messages(self):
+        """Process pending incoming messages; a no-op for drivers that don't poll."""
+        pass
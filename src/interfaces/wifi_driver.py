@@ -2,8 +2,8 @@ from .base import ABC, abstractmethod
 
 class WifiDriverInterface(ABC):
     @abstractmethod
-    def connect(self, ssid: str, password: str) -> bool:
-        """Connect to a Wi-Fi network with the given SSID and password."""
+    def connect(self, ssid: str, password: str, timeout: int = 15) -> bool:
+        """Connect to a Wi-Fi network with the given SSID and password, giving up after `timeout` seconds."""
         pass
 
     @abstractmethod
@@ -0,0 +1,41 @@
+import pytest
+from unittest.mock import Mock
+from src.app.intercom import Intercom
+from src.interfaces.gpio_driver import GPIODriverInterface
+from src.interfaces.mqtt_driver import MqttDriverInterface
+from src.interfaces.wifi_driver import WifiDriverInterface
+
+
+def fresh_mocks():
+    """Return new (wifi, mqtt, gpio) driver mocks spec'd against their interfaces."""
+    return (
+        Mock(spec=WifiDriverInterface),
+        Mock(spec=MqttDriverInterface),
+        Mock(spec=GPIODriverInterface),
+    )
+
+
+@pytest.fixture(autouse=True)
+def _no_sleep(monkeypatch):
+    """Skip the real delays in the unlock sequence and main-loop error paths."""
+    monkeypatch.setattr("src.app.intercom.sleep", lambda *a, **k: None)
+
+
+@pytest.fixture
+def intercom():
+    """Intercom whose drivers are replaced by spec'd mocks.
+
+    Function-scoped on purpose: tests mutate the controller (clock, debounce,
+    call state, run flag), so sharing one instance would leak state between them.
+    """
+    intercom = Intercom()
+    intercom.wifi_driver, intercom.mqtt_driver, intercom.gpio_driver = fresh_mocks()
+    return intercom
+
+
+@pytest.fixture
+def ota_intercom():
+    """Like intercom, but given a Mock OTA callback through the constructor."""
+    intercom = Intercom(ota_callback=Mock())
+    intercom.wifi_driver, intercom.mqtt_driver, intercom.gpio_driver = fresh_mocks()
+    return intercom
@@ -2,57 +2,47 @@
 
 import pytest
 from unittest.mock import Mock, patch
-from src.app.intercom import Intercom
 
 
-def test_intercom_subscribes_to_ota_when_callback_provided():
+def test_intercom_subscribes_to_ota_when_callback_provided(ota_intercom):
     """Test that intercom subscribes to OTA topic when callback is provided."""
-    ota_callback = Mock()
-    intercom = Intercom(ota_callback=ota_callback)
+    intercom = ota_intercom
 
     # Mock MQTT driver
-    intercom.mqtt_driver.connect = Mock(return_value=True)
-    intercom.mqtt_driver.subscribe = Mock()
-    intercom.mqtt_driver.publish = Mock()
+    intercom.mqtt_driver.connect.return_value = True
 
     # Connect MQTT
     result = intercom._connect_mqtt()
 
     assert result == True
     # Should subscribe to OTA topic with the callback
-    calls = [str(call) for call in intercom.mqtt_driver.subscribe.call_args_list]
-    ota_subscription_found = any("pyntercom/ota" in call for call in calls)
+    calls = intercom.mqtt_driver.subscribe.call_args_list
+    ota_subscription_found = any(call.args[0] == "pyntercom/ota" for call in calls)
     assert ota_subscription_found, f"OTA subscription not found in calls: {calls}"
 
 
-def test_intercom_does_not_subscribe_to_ota_when_no_callback():
+def test_intercom_does_not_subscribe_to_ota_when_no_callback(intercom):
     """Test that intercom doesn't subscribe to OTA topic when callback is None."""
-    intercom = Intercom(ota_callback=None)
-
     # Mock MQTT driver
-    intercom.mqtt_driver.connect = Mock(return_value=True)
-    intercom.mqtt_driver.subscribe = Mock()
-    intercom.mqtt_driver.publish = Mock()
+    intercom.mqtt_driver.connect.return_value = True
 
     # Connect MQTT
     result = intercom._connect_mqtt()
 
     assert result == True
     # Should NOT subscribe to OTA topic
-    calls = [str(call) for call in intercom.mqtt_driver.subscribe.call_args_list]
-    ota_subscription_found = any("pyntercom/ota" in call for call in calls)
+    calls = intercom.mqtt_driver.subscribe.call_args_list
+    ota_subscription_found = any(call.args[0] == "pyntercom/ota" for call in calls)
     assert not ota_subscription_found, f"OTA subscription should not be present: {calls}"
 
 
-def test_ota_callback_is_called_when_mqtt_message_received():
+def test_ota_callback_is_called_when_mqtt_message_received(ota_intercom):
     """Test that OTA callback is invoked when MQTT message arrives on OTA topic."""
-    ota_callback = Mock()
-    intercom = Intercom(ota_callback=ota_callback)
+    intercom = ota_intercom
+    ota_callback = intercom.ota_callback
 
     # Mock MQTT connection
-    intercom.mqtt_driver.connect = Mock(return_value=True)
-    intercom.mqtt_driver.subscribe = Mock()
-    intercom.mqtt_driver.publish = Mock()
+    intercom.mqtt_driver.connect.return_value = True
 
     # Connect and capture the callback
     intercom._connect_mqtt()
@@ -69,15 +59,13 @@ def test_ota_callback_is_called_when_mqtt_message_received():
     assert ota_topic_callback == ota_callback, "Wrong callback registered"
 
 
-def test_ota_subscription_survives_reconnection():
+def test_ota_subscription_survives_reconnection(intercom):
     """Test that OTA subscription is restored after MQTT reconnects."""
     ota_callback = Mock()
-    intercom = Intercom(ota_callback=ota_callback)
+    intercom.ota_callback = ota_callback
 
     # Mock MQTT driver
-    intercom.mqtt_driver.connect = Mock(return_value=True)
-    intercom.mqtt_driver.subscribe = Mock()
-    intercom.mqtt_driver.publish = Mock()
+    intercom.mqtt_driver.connect.return_value = True
 
     # Connect once
     intercom._connect_mqtt()
@@ -87,22 +75,18 @@ def test_ota_subscription_survives_reconnection():
     intercom._connect_mqtt()
 
     # Should subscribe again
-    calls = [str(call) for call in intercom.mqtt_driver.subscribe.call_args_list]
-    ota_subscription_found = any("pyntercom/ota" in call for call in calls)
+    calls = intercom.mqtt_driver.subscribe.call_args_list
+    ota_subscription_found = any(call.args[0] == "pyntercom/ota" for call in calls)
     assert ota_subscription_found, "OTA subscription not restored after reconnect"
 
 
-def test_intercom_backwards_compatible_without_ota():
+def test_intercom_backwards_compatible_without_ota(intercom):
     """Test that intercom works without OTA callback (backwards compatibility)."""
-    # Create intercom without OTA callback (old way)
-    intercom = Intercom()
-
+    # Intercom created without OTA callback (old way)
     assert intercom.ota_callback is None
 
     # Should still connect to MQTT successfully
-    intercom.mqtt_driver.connect = Mock(return_value=True)
-    intercom.mqtt_driver.subscribe = Mock()
-    intercom.mqtt_driver.publish = Mock()
+    intercom.mqtt_driver.connect.return_value = True
 
     result = intercom._connect_mqtt()
     assert result == True
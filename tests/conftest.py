@@ -0,0 +1,8 @@
+import pytest
+from src.app.ota import OTAServer
+
+
+@pytest.fixture
+def ota_server():
+    """OTA server with the default port and password; nothing is bound until start()."""
+    return OTAServer()
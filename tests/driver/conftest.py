@@ -0,0 +1,27 @@
+import sys
+from types import ModuleType
+
+import pytest
+
+from src.driver.driver_manager import DriverManager
+from tests.mock.fake_pin import FakePin
+
+
+@pytest.fixture(scope="module")
+def fake_machine_module():
+    """Installs a fake machine module with FakePin once per requesting test module.
+
+    Module- rather than session-scoped so the fake is gone again before other
+    driver tests that expect `machine` to be missing or mocked differently run.
+    """
+    fake_machine = ModuleType("machine")
+    fake_machine.Pin = FakePin
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setitem(sys.modules, "machine", fake_machine)
+        yield fake_machine
+
+
+@pytest.fixture(scope="module")
+def driver_manager():
+    """DriverManager holds no state and reads sys.platform per load call, so one instance is shared."""
+    return DriverManager()
@@ -0,0 +1,9 @@
+import pytest
+
+from src.driver.gpio_driver.esp8266_gpio_driver import ESP8266GPIODriver
+
+
+@pytest.fixture
+def gpio_driver(fake_machine_module):
+    """Fresh driver per test, so pin state never carries over between tests."""
+    return ESP8266GPIODriver()
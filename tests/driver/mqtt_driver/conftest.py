@@ -0,0 +1,58 @@
+import sys
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
+from tests.mock.mqtt_client import mqtt_client_mock
+
+
+def _install_umqtt(monkeypatch, client_factory):
+    """Registers plain-namespace umqtt/umqtt.simple modules exposing client_factory as MQTTClient.
+
+    Esp8266MQTTDriver imports umqtt inside connect(), so the already-imported
+    driver module picks these up without being evicted and re-imported.
+    """
+    mock_umqtt = SimpleNamespace(simple=SimpleNamespace(MQTTClient=client_factory))
+    monkeypatch.setitem(sys.modules, "umqtt", mock_umqtt)
+    monkeypatch.setitem(sys.modules, "umqtt.simple", mock_umqtt.simple)
+    return mock_umqtt
+
+
+@pytest.fixture
+def mock_mqtt_success(monkeypatch):
+    """Fake umqtt whose MQTTClient factory returns a mock client."""
+    mock_mqtt_client = mqtt_client_mock()
+    mock_umqtt = _install_umqtt(monkeypatch, Mock(return_value=mock_mqtt_client))
+    return {
+        'mqtt_client': mock_mqtt_client,
+        'umqtt': mock_umqtt
+    }
+
+
+@pytest.fixture
+def mock_mqtt_failure(monkeypatch):
+    """Fake umqtt whose MQTTClient factory raises, as on an unreachable broker."""
+    mock_umqtt = _install_umqtt(monkeypatch, Mock(side_effect=Exception("Connection failed")))
+    return {
+        'umqtt': mock_umqtt
+    }
+
+
+@pytest.fixture
+def mqtt_driver():
+    """Disconnected ESP8266 driver pointed at a dummy broker."""
+    return Esp8266MQTTDriver(
+        client_id="test_client",
+        server="test.broker.com"
+    )
+
+
+@pytest.fixture
+def connected_mqtt_driver(mqtt_driver):
+    """Driver already holding a mock client, as after a successful connect(); returns (driver, client)."""
+    client = mqtt_client_mock()
+    mqtt_driver.client = client
+    mqtt_driver.connected = True
+    return mqtt_driver, client
@@ -1,17 +1,11 @@
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-import sys
+from unittest.mock import Mock
+from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
+from src.interfaces.mqtt_driver import MqttError
+from tests.mock.mqtt_client import mqtt_client_mock
 
 
-def test_esp8266_mqtt_driver_initialization():
-    from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
-    
-    mqtt_driver = Esp8266MQTTDriver(
-        client_id="test_client",
-        server="test.broker.com",
-        port=1883
-    )
-    
+def test_esp8266_mqtt_driver_initialization(mqtt_driver):
     assert mqtt_driver is not None
     assert mqtt_driver.client_id == "test_client"
     assert mqtt_driver.server == "test.broker.com"
@@ -21,104 +15,56 @@ def test_esp8266_mqtt_driver_initialization():
     assert mqtt_driver.subscriptions == {}
 
 
-def test_esp8266_mqtt_driver_connect():
-    mock_mqtt_client = Mock()
-    mock_umqtt = MagicMock()
-    mock_umqtt.simple.MQTTClient.return_value = mock_mqtt_client
+def test_esp8266_mqtt_driver_connect(mock_mqtt_success):
+    mqtt_driver = Esp8266MQTTDriver(
+        client_id="test_client",
+        server="test.broker.com",
+        mqtt_username="user",
+        mqtt_password="pass"
+    )
     
-    with patch.dict(sys.modules, {'umqtt.simple': mock_umqtt.simple, 'umqtt': mock_umqtt}):
-        if 'src.driver.mqtt_driver.esp8266_mqtt_driver' in sys.modules:
-            del sys.modules['src.driver.mqtt_driver.esp8266_mqtt_driver']
-        
-        from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
-        
-        mqtt_driver = Esp8266MQTTDriver(
-            client_id="test_client",
-            server="test.broker.com",
-            mqtt_username="user",
-            mqtt_password="pass"
-        )
-        
-        result = mqtt_driver.connect()
-        
-        assert result is True
-        assert mqtt_driver.connected is True
-        assert mqtt_driver.client == mock_mqtt_client
-        
-        mock_umqtt.simple.MQTTClient.assert_called_once_with(
-            client_id="test_client",
-            server="test.broker.com",
-            port=1883,
-            user="user",
-            password="pass",
-            keepalive=60,
-            ssl=False,
-            ssl_params={}
-        )
-        mock_mqtt_client.set_callback.assert_called_once()
-        mock_mqtt_client.connect.assert_called_once()
-
-
-def test_esp8266_mqtt_driver_connect_failure():
-    mock_umqtt = MagicMock()
-    mock_umqtt.simple.MQTTClient.side_effect = Exception("Connection failed")
+    result = mqtt_driver.connect()
     
-    with patch.dict(sys.modules, {'umqtt.simple': mock_umqtt.simple, 'umqtt': mock_umqtt}):
-        if 'src.driver.mqtt_driver.esp8266_mqtt_driver' in sys.modules:
-            del sys.modules['src.driver.mqtt_driver.esp8266_mqtt_driver']
-        
-        from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
-        
-        mqtt_driver = Esp8266MQTTDriver(
-            client_id="test_client",
-            server="test.broker.com"
-        )
-        
-        result = mqtt_driver.connect()
-        
-        assert result is False
-        assert mqtt_driver.connected is False
-        assert mqtt_driver.client is None
-
-
-def test_esp8266_mqtt_driver_connect_with_existing_subscriptions():
-    mock_mqtt_client = Mock()
-    mock_umqtt = MagicMock()
-    mock_umqtt.simple.MQTTClient.return_value = mock_mqtt_client
+    assert result is True
+    assert mqtt_driver.connected is True
+    assert mqtt_driver.client == mock_mqtt_success['mqtt_client']
     
-    with patch.dict(sys.modules, {'umqtt.simple': mock_umqtt.simple, 'umqtt': mock_umqtt}):
-        if 'src.driver.mqtt_driver.esp8266_mqtt_driver' in sys.modules:
-            del sys.modules['src.driver.mqtt_driver.esp8266_mqtt_driver']
-        
-        from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
-        
-        mqtt_driver = Esp8266MQTTDriver(
-            client_id="test_client",
-            server="test.broker.com"
-        )
-        
-        mqtt_driver.subscriptions = {"topic1": None, "topic2": None}
-        
-        result = mqtt_driver.connect()
-        
-        assert result is True
-        assert mock_mqtt_client.subscribe.call_count == 2
-        mock_mqtt_client.subscribe.assert_any_call("topic1")
-        mock_mqtt_client.subscribe.assert_any_call("topic2")
-
-
-def test_esp8266_mqtt_driver_disconnect():
-    mock_mqtt_client = Mock()
+    mock_mqtt_success['umqtt'].simple.MQTTClient.assert_called_once_with(
+        client_id="test_client",
+        server="test.broker.com",
+        port=1883,
+        user="user",
+        password="pass",
+        keepalive=60,
+        ssl=False,
+        ssl_params={}
+    )
+    mock_mqtt_success['mqtt_client'].set_callback.assert_called_once()
+    mock_mqtt_success['mqtt_client'].connect.assert_called_once()
+
+
+def test_esp8266_mqtt_driver_connect_failure(mock_mqtt_failure, mqtt_driver):
+    result = mqtt_driver.connect()
     
-    from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
+    assert result is False
+    assert mqtt_driver.connected is False
+    assert mqtt_driver.client is None
+
+
+def test_esp8266_mqtt_driver_connect_with_existing_subscriptions(mock_mqtt_success, mqtt_driver):
+    mock_mqtt_client = mock_mqtt_success['mqtt_client']
+    mqtt_driver.subscriptions = {"topic1": None, "topic2": None}
     
-    mqtt_driver = Esp8266MQTTDriver(
-        client_id="test_client",
-        server="test.broker.com"
-    )
+    result = mqtt_driver.connect()
     
-    mqtt_driver.client = mock_mqtt_client
-    mqtt_driver.connected = True
+    assert result is True
+    assert mock_mqtt_client.subscribe.call_count == 2
+    mock_mqtt_client.subscribe.assert_any_call("topic1")
+    mock_mqtt_client.subscribe.assert_any_call("topic2")
+
+
+def test_esp8266_mqtt_driver_disconnect(connected_mqtt_driver):
+    mqtt_driver, mock_mqtt_client = connected_mqtt_driver
     
     mqtt_driver.disconnect()
     
@@ -127,38 +73,18 @@ def test_esp8266_mqtt_driver_disconnect():
     mock_mqtt_client.disconnect.assert_called_once()
 
 
-def test_esp8266_mqtt_driver_disconnect_with_error():
-    mock_mqtt_client = Mock()
+def test_esp8266_mqtt_driver_disconnect_with_error(connected_mqtt_driver):
+    mqtt_driver, mock_mqtt_client = connected_mqtt_driver
     mock_mqtt_client.disconnect.side_effect = Exception("Disconnect failed")
     
-    from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
-    
-    mqtt_driver = Esp8266MQTTDriver(
-        client_id="test_client",
-        server="test.broker.com"
-    )
-    
-    mqtt_driver.client = mock_mqtt_client
-    mqtt_driver.connected = True
-    
     mqtt_driver.disconnect()
     
     assert mqtt_driver.connected is False
     assert mqtt_driver.client is None
 
 
-def test_esp8266_mqtt_driver_publish():
-    mock_mqtt_client = Mock()
-    
-    from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
-    
-    mqtt_driver = Esp8266MQTTDriver(
-        client_id="test_client",
-        server="test.broker.com"
-    )
-    
-    mqtt_driver.client = mock_mqtt_client
-    mqtt_driver.connected = True
+def test_esp8266_mqtt_driver_publish(connected_mqtt_driver):
+    mqtt_driver, mock_mqtt_client = connected_mqtt_driver
     
     result = mqtt_driver.publish("test/topic", "test message", retain=True)
     
@@ -166,50 +92,18 @@ def test_esp8266_mqtt_driver_publish():
     mock_mqtt_client.publish.assert_called_once_with("test/topic", "test message", retain=True)
 
 
-def test_esp8266_mqtt_driver_publish_not_connected():
-    from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
-    
-    mqtt_driver = Esp8266MQTTDriver(
-        client_id="test_client",
-        server="test.broker.com"
-    )
-    
-    with pytest.raises(Exception, match="Not connected to MQTT broker"):
-        mqtt_driver.publish("test/topic", "test message")
-
-
-def test_esp8266_mqtt_driver_publish_failure():
-    mock_mqtt_client = Mock()
-    mock_mqtt_client.publish.side_effect = Exception("Publish failed")
-    
-    from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
-    
-    mqtt_driver = Esp8266MQTTDriver(
-        client_id="test_client",
-        server="test.broker.com"
-    )
-    
-    mqtt_driver.client = mock_mqtt_client
-    mqtt_driver.connected = True
+def test_esp8266_mqtt_driver_publish_failure(connected_mqtt_driver):
+    mqtt_driver, mock_mqtt_client = connected_mqtt_driver
+    mock_mqtt_client.publish.side_effect = OSError("Publish failed")
     
-    with pytest.raises(Exception, match="Publish failed"):
+    with pytest.raises(OSError):
         mqtt_driver.publish("test/topic", "test message")
 
 
-def test_esp8266_mqtt_driver_subscribe():
-    mock_mqtt_client = Mock()
+def test_esp8266_mqtt_driver_subscribe(connected_mqtt_driver):
+    mqtt_driver, mock_mqtt_client = connected_mqtt_driver
     mock_callback = Mock()
     
-    from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
-    
-    mqtt_driver = Esp8266MQTTDriver(
-        client_id="test_client",
-        server="test.broker.com"
-    )
-    
-    mqtt_driver.client = mock_mqtt_client
-    mqtt_driver.connected = True
-    
     result = mqtt_driver.subscribe("test/topic", mock_callback)
     
     assert result is True
@@ -218,30 +112,8 @@ def test_esp8266_mqtt_driver_subscribe():
     mock_mqtt_client.subscribe.assert_called_once_with("test/topic")
 
 
-def test_esp8266_mqtt_driver_subscribe_not_connected():
-    from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
-    
-    mqtt_driver = Esp8266MQTTDriver(
-        client_id="test_client",
-        server="test.broker.com"
-    )
-    
-    with pytest.raises(Exception, match="Not connected to MQTT broker"):
-        mqtt_driver.subscribe("test/topic")
-
-
-def test_esp8266_mqtt_driver_unsubscribe():
-    mock_mqtt_client = Mock()
-    
-    from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
-    
-    mqtt_driver = Esp8266MQTTDriver(
-        client_id="test_client",
-        server="test.broker.com"
-    )
-    
-    mqtt_driver.client = mock_mqtt_client
-    mqtt_driver.connected = True
+def test_esp8266_mqtt_driver_unsubscribe(connected_mqtt_driver):
+    mqtt_driver, mock_mqtt_client = connected_mqtt_driver
     mqtt_driver.subscriptions["test/topic"] = Mock()
     
     result = mqtt_driver.unsubscribe("test/topic")
@@ -251,97 +123,33 @@ def test_esp8266_mqtt_driver_unsubscribe():
     mock_mqtt_client.unsubscribe.assert_called_once_with("test/topic")
 
 
-def test_esp8266_mqtt_driver_on_message():
-    mock_callback = Mock()
-    
-    from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
-    
-    mqtt_driver = Esp8266MQTTDriver(
-        client_id="test_client",
-        server="test.broker.com"
-    )
-    
-    mqtt_driver.subscriptions["test/topic"] = mock_callback
-    
-    mqtt_driver._on_message(b"test/topic", b"test message")
-    
-    mock_callback.assert_called_once_with("test/topic", "test message")
+@pytest.mark.parametrize("topic,msg,callback_factory,expected", [
+    (b"test/topic", b"test message", Mock, ("test/topic", "test message")),
+    ("test/topic", "test message", Mock, ("test/topic", "test message")),
+    ("test/topic", "test message", lambda: None, None),
+    ("test/topic", "test message", lambda: Mock(side_effect=Exception("Callback error")), None),
+], ids=["bytes_input", "string_input", "no_callback", "callback_error"])
+def test_esp8266_mqtt_driver_on_message(mqtt_driver, topic, msg, callback_factory, expected):
+    callback = callback_factory()
+    mqtt_driver.subscriptions["test/topic"] = callback
 
+    mqtt_driver._on_message(topic, msg)
 
-def test_esp8266_mqtt_driver_on_message_string_input():
-    mock_callback = Mock()
-    
-    from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
-    
-    mqtt_driver = Esp8266MQTTDriver(
-        client_id="test_client",
-        server="test.broker.com"
-    )
-    
-    mqtt_driver.subscriptions["test/topic"] = mock_callback
-    
-    mqtt_driver._on_message("test/topic", "test message")
-    
-    mock_callback.assert_called_once_with("test/topic", "test message")
-
-
-def test_esp8266_mqtt_driver_on_message_no_callback():
-    from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
-    
-    mqtt_driver = Esp8266MQTTDriver(
-        client_id="test_client",
-        server="test.broker.com"
-    )
-    
-    mqtt_driver.subscriptions["test/topic"] = None
-    
-    mqtt_driver._on_message("test/topic", "test message")
+    if expected is not None:
+        callback.assert_called_once_with(*expected)
 
 
-def test_esp8266_mqtt_driver_on_message_callback_error():
-    mock_callback = Mock()
-    mock_callback.side_effect = Exception("Callback error")
-    
-    from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
-    
-    mqtt_driver = Esp8266MQTTDriver(
-        client_id="test_client",
-        server="test.broker.com"
-    )
-    
-    mqtt_driver.subscriptions["test/topic"] = mock_callback
-    
-    mqtt_driver._on_message("test/topic", "test message")
-
-
-def test_esp8266_mqtt_driver_is_connected():
-    from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
-    
-    mqtt_driver = Esp8266MQTTDriver(
-        client_id="test_client",
-        server="test.broker.com"
-    )
-    
+def test_esp8266_mqtt_driver_is_connected(mqtt_driver):
     assert mqtt_driver.is_connected() is False
     
     mqtt_driver.connected = True
-    mqtt_driver.client = Mock()
+    mqtt_driver.client = mqtt_client_mock()
     
     assert mqtt_driver.is_connected() is True
 
 
-def test_esp8266_mqtt_driver_check_messages():
-    mock_mqtt_client = Mock()
-    
-    from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
-    
-    mqtt_driver = Esp8266MQTTDriver(
-        client_id="test_client",
-        server="test.broker.com"
-    )
-    
-    mqtt_driver.client = mock_mqtt_client
-    mqtt_driver.connected = True
+def test_esp8266_mqtt_driver_check_messages(connected_mqtt_driver):
+    mqtt_driver, mock_mqtt_client = connected_mqtt_driver
     
     result = mqtt_driver.check_messages()
     
@@ -349,51 +157,8 @@ def test_esp8266_mqtt_driver_check_messages():
     mock_mqtt_client.check_msg.assert_called_once()
 
 
-def test_esp8266_mqtt_driver_check_messages_not_connected():
-    from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
-    
-    mqtt_driver = Esp8266MQTTDriver(
-        client_id="test_client",
-        server="test.broker.com"
-    )
-    
-    result = mqtt_driver.check_messages()
-    
-    assert result is False
-
-
-def test_esp8266_mqtt_driver_check_messages_error():
-    mock_mqtt_client = Mock()
-    mock_mqtt_client.check_msg.side_effect = Exception("Check message error")
-    
-    from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
-    
-    mqtt_driver = Esp8266MQTTDriver(
-        client_id="test_client",
-        server="test.broker.com"
-    )
-    
-    mqtt_driver.client = mock_mqtt_client
-    mqtt_driver.connected = True
-    
-    result = mqtt_driver.check_messages()
-    
-    assert result is False
-    assert mqtt_driver.connected is False
-
-
-def test_esp8266_mqtt_driver_wait_msg():
-    mock_mqtt_client = Mock()
-    
-    from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
-    
-    mqtt_driver = Esp8266MQTTDriver(
-        client_id="test_client",
-        server="test.broker.com"
-    )
-    
-    mqtt_driver.client = mock_mqtt_client
-    mqtt_driver.connected = True
+def test_esp8266_mqtt_driver_wait_msg(connected_mqtt_driver):
+    mqtt_driver, mock_mqtt_client = connected_mqtt_driver
     
     result = mqtt_driver.wait_msg()
     
@@ -401,42 +166,39 @@ def test_esp8266_mqtt_driver_wait_msg():
     mock_mqtt_client.wait_msg.assert_called_once()
 
 
-def test_esp8266_mqtt_driver_wait_msg_not_connected():
-    from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
-    
-    mqtt_driver = Esp8266MQTTDriver(
-        client_id="test_client",
-        server="test.broker.com"
-    )
-    
-    result = mqtt_driver.wait_msg()
-    
-    assert result is False
+@pytest.mark.parametrize(
+    "method,args",
+    [
+        ("publish", ("test/topic", "test message")),
+        ("subscribe", ("test/topic",)),
+        ("unsubscribe", ("test/topic",)),
+    ],
+)
+def test_esp8266_mqtt_driver_raises_when_not_connected(mqtt_driver, method, args):
+    with pytest.raises(MqttError):
+        getattr(mqtt_driver, method)(*args)
 
 
-def test_esp8266_mqtt_driver_wait_msg_error():
-    mock_mqtt_client = Mock()
-    mock_mqtt_client.wait_msg.side_effect = Exception("Wait message error")
-    
-    from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
-    
-    mqtt_driver = Esp8266MQTTDriver(
-        client_id="test_client",
-        server="test.broker.com"
-    )
-    
-    mqtt_driver.client = mock_mqtt_client
-    mqtt_driver.connected = True
+@pytest.mark.parametrize("method", ["check_messages", "wait_msg"])
+def test_esp8266_mqtt_driver_returns_false_when_not_connected(mqtt_driver, method):
+    assert getattr(mqtt_driver, method)() is False
+
+
+@pytest.mark.parametrize(
+    "method,client_method",
+    [("check_messages", "check_msg"), ("wait_msg", "wait_msg")],
+)
+def test_esp8266_mqtt_driver_drops_connection_on_receive_error(connected_mqtt_driver, method, client_method):
+    mqtt_driver, mock_mqtt_client = connected_mqtt_driver
+    getattr(mock_mqtt_client, client_method).side_effect = Exception("Receive error")
     
-    result = mqtt_driver.wait_msg()
+    result = getattr(mqtt_driver, method)()
     
     assert result is False
     assert mqtt_driver.connected is False
 
 
 def test_esp8266_mqtt_driver_get_client_info():
-    from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
-    
     mqtt_driver = Esp8266MQTTDriver(
         client_id="test_client",
         server="test.broker.com",
@@ -459,44 +221,14 @@ def test_esp8266_mqtt_driver_get_client_info():
     assert info == expected_info
 
 
-@pytest.fixture
-def mock_mqtt_success():
-    mock_mqtt_client = Mock()
-    mock_umqtt = MagicMock()
-    mock_umqtt.simple.MQTTClient.return_value = mock_mqtt_client
-    
-    with patch.dict(sys.modules, {'umqtt.simple': mock_umqtt.simple, 'umqtt': mock_umqtt}):
-        if 'src.driver.mqtt_driver.esp8266_mqtt_driver' in sys.modules:
-            del sys.modules['src.driver.mqtt_driver.esp8266_mqtt_driver']
-        
-        yield {
-            'mqtt_client': mock_mqtt_client,
-            'umqtt': mock_umqtt
-        }
-
-
-def test_with_fixture(mock_mqtt_success):
-    from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
-    
-    mqtt_driver = Esp8266MQTTDriver(
-        client_id="test_client",
-        server="test.broker.com"
-    )
-    
+def test_with_fixture(mock_mqtt_success, mqtt_driver):
     result = mqtt_driver.connect()
     
     assert result is True
     assert mqtt_driver.connected is True
     mock_mqtt_success['mqtt_client'].connect.assert_called_once()
     
-def test_esp8266_mqtt_driver_no_umqtt_module():
-    from src.driver.mqtt_driver.esp8266_mqtt_driver import Esp8266MQTTDriver
-    
-    mqtt_driver = Esp8266MQTTDriver(
-        client_id="test_client",
-        server="test.broker.com"
-    )
-    
+def test_esp8266_mqtt_driver_no_umqtt_module(mqtt_driver):
     result = mqtt_driver.connect()
     assert result is False
     assert mqtt_driver.connected is False
@@ -0,0 +1,63 @@
+import importlib
+import sys
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+import src.helper.sleep as sleep_module
+from tests.mock.wlan import wlan_mock
+
+DRIVER_MODULE = "src.driver.wifi_driver.esp8266_wifi_driver"
+
+
+@pytest.fixture(autouse=True)
+def _reset_wifi_module(monkeypatch):
+    """Evicts the driver module so each test imports it against its own patched network/sleep.
+
+    The driver binds `sleep` at import time, so a module cached by an earlier
+    test would keep that test's mocks. Anything the test imports is dropped
+    again afterwards, and monkeypatch then puts the original driver module back.
+    """
+    monkeypatch.delitem(sys.modules, DRIVER_MODULE, raising=False)
+    before = set(sys.modules)
+    yield
+    for name in set(sys.modules) - before:
+        sys.modules.pop(name, None)
+
+
+@pytest.fixture
+def wifi_mocks(monkeypatch):
+    """Fake network module whose WLAN() hands out mock STA/AP interfaces, with sleep patched out.
+
+    Tests configure the STA interface (isconnected, ifconfig, ...) before
+    importing the driver.
+    """
+    mock_sta_if = wlan_mock()
+    mock_sta_if.ifconfig.return_value = ("192.168.1.100", "255.255.255.0", "192.168.1.1", "8.8.8.8")
+    mock_ap_if = wlan_mock()
+
+    mock_network = SimpleNamespace(STA_IF=0, AP_IF=1, WLAN=Mock(side_effect={0: mock_sta_if, 1: mock_ap_if}.get))
+
+    mock_sleep = Mock()
+
+    monkeypatch.setitem(sys.modules, 'network', mock_network)
+    monkeypatch.setattr(sleep_module, 'sleep', mock_sleep)
+    return {
+        'network': mock_network,
+        'sta_if': mock_sta_if,
+        'ap_if': mock_ap_if,
+        'sleep': mock_sleep
+    }
+
+
+@pytest.fixture
+def patched_driver_cls(wifi_mocks):
+    """Esp8266WifiDriver imported fresh while the fake network module and sleep are in place."""
+    return importlib.import_module(DRIVER_MODULE).Esp8266WifiDriver
+
+
+@pytest.fixture(scope="session")
+def driver_cls():
+    """Esp8266WifiDriver as imported off-device, for tests that run it without a network module."""
+    return importlib.import_module(DRIVER_MODULE).Esp8266WifiDriver
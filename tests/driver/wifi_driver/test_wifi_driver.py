@@ -1,233 +1,87 @@
-import pytest
-from unittest.mock import Mock, patch, MagicMock
-import sys
+from unittest.mock import call
 
 
-def test_esp8266_wifi_driver_initialization():
-    from src.driver.wifi_driver.esp8266_wifi_driver import Esp8266WifiDriver
-    wifi_driver = Esp8266WifiDriver()
+def test_esp8266_wifi_driver_initialization(driver_cls):
+    wifi_driver = driver_cls()
     assert wifi_driver is not None
 
 
-def test_esp8266_wifi_driver_can_connect_to_wifi():
-    mock_sta_if = Mock()
-    mock_ap_if = Mock()
-    
-    mock_network = MagicMock()
-    mock_network.STA_IF = 0
-    mock_network.AP_IF = 1
-    
-    def wlan_factory(interface_type):
-        return mock_sta_if if interface_type == 0 else mock_ap_if
-    
-    mock_network.WLAN = Mock(side_effect=wlan_factory)
-    
+def test_esp8266_wifi_driver_can_connect_to_wifi(wifi_mocks, patched_driver_cls):
+    mock_sta_if = wifi_mocks['sta_if']
     mock_sta_if.isconnected.side_effect = [False, False, False, True, True]
-    mock_sta_if.ifconfig.return_value = ("192.168.1.100", "255.255.255.0", "192.168.1.1", "8.8.8.8")
-    mock_sta_if.connect.return_value = None
-    mock_sta_if.active.return_value = None
-    mock_sta_if.disconnect.return_value = None
-    
-    mock_sleep = Mock()
-    
-    with patch.dict(sys.modules, {'network': mock_network}):
-        with patch("src.helper.sleep.sleep", mock_sleep):
-            if 'src.driver.wifi_driver.esp8266_wifi_driver' in sys.modules:
-                del sys.modules['src.driver.wifi_driver.esp8266_wifi_driver']
-            
-            from src.driver.wifi_driver.esp8266_wifi_driver import Esp8266WifiDriver
-            
-            wifi_driver = Esp8266WifiDriver()
-            result = wifi_driver.connect(ssid="TestSSID", password="TestPassword")
-            
-            assert result is True
-            assert mock_network.WLAN.call_count == 2
-            mock_ap_if.active.assert_called_with(False)
-            mock_sta_if.active.assert_called_with(True)
-            mock_sta_if.connect.assert_called_once_with("TestSSID", "TestPassword")
-            assert mock_sleep.call_count >= 2
-
-
-def test_esp8266_wifi_driver_connection_failure():
-    mock_sta_if = Mock()
-    mock_ap_if = Mock()
     
-    mock_network = MagicMock()
-    mock_network.STA_IF = 0
-    mock_network.AP_IF = 1
-    
-    def wlan_factory(interface_type):
-        return mock_sta_if if interface_type == 0 else mock_ap_if
-    
-    mock_network.WLAN = Mock(side_effect=wlan_factory)
+    wifi_driver = patched_driver_cls()
+    result = wifi_driver.connect(ssid="TestSSID", password="TestPassword")
     
+    assert result is True
+    assert wifi_mocks['network'].WLAN.call_count == 2
+    wifi_mocks['ap_if'].active.assert_called_with(False)
+    mock_sta_if.active.assert_called_with(True)
+    mock_sta_if.connect.assert_called_once_with("TestSSID", "TestPassword")
+    assert wifi_mocks['sleep'].call_count >= 2
+
+
+def test_esp8266_wifi_driver_connection_failure(wifi_mocks, patched_driver_cls):
+    mock_sta_if = wifi_mocks['sta_if']
     mock_sta_if.isconnected.return_value = False
-    mock_sta_if.connect.return_value = None
-    mock_sta_if.active.return_value = None
-    
-    mock_sleep = Mock()
     
-    with patch.dict(sys.modules, {'network': mock_network}):
-        with patch("src.helper.sleep.sleep", mock_sleep):
-            if 'src.driver.wifi_driver.esp8266_wifi_driver' in sys.modules:
-                del sys.modules['src.driver.wifi_driver.esp8266_wifi_driver']
-            
-            from src.driver.wifi_driver.esp8266_wifi_driver import Esp8266WifiDriver
-            
-            wifi_driver = Esp8266WifiDriver()
-            result = wifi_driver.connect(ssid="TestSSID", password="TestPassword")
-            
-            assert result is False
-            mock_sta_if.connect.assert_called_once_with("TestSSID", "TestPassword")
-            assert mock_sleep.call_count == 15
-
-
-def test_esp8266_wifi_driver_no_network_module():
-    from src.driver.wifi_driver.esp8266_wifi_driver import Esp8266WifiDriver
+    wifi_driver = patched_driver_cls()
+    result = wifi_driver.connect(ssid="TestSSID", password="TestPassword", timeout=3)
     
-    wifi_driver = Esp8266WifiDriver()
+    assert result is False
+    mock_sta_if.connect.assert_called_once_with("TestSSID", "TestPassword")
+    assert wifi_mocks['sleep'].call_args_list == [call(1)] * 3
+
+
+def test_esp8266_wifi_driver_no_network_module(driver_cls):
+    wifi_driver = driver_cls()
     result = wifi_driver.connect(ssid="TestSSID", password="TestPassword")
     
     assert result is False
 
 
-def test_esp8266_wifi_driver_already_connected():
-    mock_sta_if = Mock()
-    mock_ap_if = Mock()
-    
-    mock_network = MagicMock()
-    mock_network.STA_IF = 0
-    mock_network.AP_IF = 1
-    
-    def wlan_factory(interface_type):
-        return mock_sta_if if interface_type == 0 else mock_ap_if
-    
-    mock_network.WLAN = Mock(side_effect=wlan_factory)
-    
+def test_esp8266_wifi_driver_already_connected(wifi_mocks, patched_driver_cls):
+    mock_sta_if = wifi_mocks['sta_if']
     mock_sta_if.isconnected.side_effect = [True, False, False, True, True]
-    mock_sta_if.ifconfig.return_value = ("192.168.1.100", "255.255.255.0", "192.168.1.1", "8.8.8.8")
-    mock_sta_if.connect.return_value = None
-    mock_sta_if.active.return_value = None
-    mock_sta_if.disconnect.return_value = None
-    
-    mock_sleep = Mock()
     
-    with patch.dict(sys.modules, {'network': mock_network}):
-        with patch("src.helper.sleep.sleep", mock_sleep):
-            if 'src.driver.wifi_driver.esp8266_wifi_driver' in sys.modules:
-                del sys.modules['src.driver.wifi_driver.esp8266_wifi_driver']
-            
-            from src.driver.wifi_driver.esp8266_wifi_driver import Esp8266WifiDriver
-            
-            wifi_driver = Esp8266WifiDriver()
-            result = wifi_driver.connect(ssid="TestSSID", password="TestPassword")
-            
-            assert result is True
-            assert mock_network.WLAN.call_count == 2
-            mock_ap_if.active.assert_called_with(False)
-            mock_sta_if.active.assert_called_with(True)
-            mock_sta_if.connect.assert_called_once_with("TestSSID", "TestPassword")
-            mock_sleep.assert_called_with(1)
-
-
-def test_esp8266_wifi_driver_disconnect():
-    mock_sta_if = Mock()
-    mock_ap_if = Mock()
-    
-    mock_network = MagicMock()
-    mock_network.STA_IF = 0
-    mock_network.AP_IF = 1
-    
-    def wlan_factory(interface_type):
-        return mock_sta_if if interface_type == 0 else mock_ap_if
-    
-    mock_network.WLAN = Mock(side_effect=wlan_factory)
+    wifi_driver = patched_driver_cls()
+    result = wifi_driver.connect(ssid="TestSSID", password="TestPassword")
     
+    assert result is True
+    assert wifi_mocks['network'].WLAN.call_count == 2
+    wifi_mocks['ap_if'].active.assert_called_with(False)
+    mock_sta_if.active.assert_called_with(True)
+    mock_sta_if.connect.assert_called_once_with("TestSSID", "TestPassword")
+    wifi_mocks['sleep'].assert_called_with(1)
+
+
+def test_esp8266_wifi_driver_disconnect(wifi_mocks, patched_driver_cls):
+    mock_sta_if = wifi_mocks['sta_if']
     mock_sta_if.isconnected.side_effect = [True, False, False]
-    mock_sta_if.disconnect.return_value = None
-    mock_sleep = Mock()
-    
-    with patch.dict(sys.modules, {'network': mock_network}):
-        with patch("src.helper.sleep.sleep", mock_sleep):
-            if 'src.driver.wifi_driver.esp8266_wifi_driver' in sys.modules:
-                del sys.modules['src.driver.wifi_driver.esp8266_wifi_driver']
-            
-            from src.driver.wifi_driver.esp8266_wifi_driver import Esp8266WifiDriver
-            
-            wifi_driver = Esp8266WifiDriver()
-            result = wifi_driver.disconnect()
-            
-            assert result is True
-            mock_sta_if.disconnect.assert_called_once()
-
-
-def test_esp8266_wifi_driver_is_connected():
-    mock_sta_if = Mock()
-    mock_ap_if = Mock()
-    
-    mock_network = MagicMock()
-    mock_network.STA_IF = 0
-    mock_network.AP_IF = 1
     
-    def wlan_factory(interface_type):
-        return mock_sta_if if interface_type == 0 else mock_ap_if
-    
-    mock_network.WLAN = Mock(side_effect=wlan_factory)
+    wifi_driver = patched_driver_cls()
+    result = wifi_driver.disconnect()
     
+    assert result is True
+    mock_sta_if.disconnect.assert_called_once()
+
+
+def test_esp8266_wifi_driver_is_connected(wifi_mocks, patched_driver_cls):
+    mock_sta_if = wifi_mocks['sta_if']
     mock_sta_if.isconnected.return_value = True
     
-    with patch.dict(sys.modules, {'network': mock_network}):
-        if 'src.driver.wifi_driver.esp8266_wifi_driver' in sys.modules:
-            del sys.modules['src.driver.wifi_driver.esp8266_wifi_driver']
-        
-        from src.driver.wifi_driver.esp8266_wifi_driver import Esp8266WifiDriver
-        
-        wifi_driver = Esp8266WifiDriver()
-        result = wifi_driver.is_connected()
-        
-        assert result is True
-        mock_sta_if.isconnected.assert_called()
-
-
-@pytest.fixture
-def mock_network_success():
-    mock_sta_if = Mock()
-    mock_ap_if = Mock()
-    
-    mock_network = MagicMock()
-    mock_network.STA_IF = 0
-    mock_network.AP_IF = 1
-    
-    def wlan_factory(interface_type):
-        return mock_sta_if if interface_type == 0 else mock_ap_if
-    
-    mock_network.WLAN = Mock(side_effect=wlan_factory)
+    wifi_driver = patched_driver_cls()
+    result = wifi_driver.is_connected()
     
-    mock_sta_if.isconnected.side_effect = [False, False, True, True]
-    mock_sta_if.ifconfig.return_value = ("192.168.1.100", "255.255.255.0", "192.168.1.1", "8.8.8.8")
-    mock_sta_if.connect.return_value = None
-    mock_sta_if.active.return_value = None
-    
-    mock_sleep = Mock()
-    
-    with patch.dict(sys.modules, {'network': mock_network}):
-        with patch("src.helper.sleep.sleep", mock_sleep):
-            if 'src.driver.wifi_driver.esp8266_wifi_driver' in sys.modules:
-                del sys.modules['src.driver.wifi_driver.esp8266_wifi_driver']
-            
-            yield {
-                'network': mock_network,
-                'sta_if': mock_sta_if,
-                'ap_if': mock_ap_if,
-                'sleep': mock_sleep
-            }
-
-
-def test_with_fixture(mock_network_success):
-    from src.driver.wifi_driver.esp8266_wifi_driver import Esp8266WifiDriver
+    assert result is True
+    mock_sta_if.isconnected.assert_called()
+
+
+def test_with_fixture(wifi_mocks, patched_driver_cls):
+    wifi_mocks['sta_if'].isconnected.side_effect = [False, False, True, True]
     
-    wifi_driver = Esp8266WifiDriver()
+    wifi_driver = patched_driver_cls()
     result = wifi_driver.connect(ssid="TestSSID", password="TestPassword")
     
     assert result is True
-    mock_network_success['sta_if'].connect.assert_called_once_with("TestSSID", "TestPassword")
\ No newline at end of file
+    wifi_mocks['sta_if'].connect.assert_called_once_with("TestSSID", "TestPassword")
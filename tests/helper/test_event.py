@@ -0,0 +1,70 @@
+import importlib.util
+import sys
+from unittest.mock import Mock
+
+import pytest
+
+import src.helper.event as event_module
+
+
+def _load_fallback_module(monkeypatch):
+    """Executes a separate copy of the helper with threading unavailable, as on the ESP8266 port.
+
+    The copy is its own module object, so the shared src.helper.event stays on
+    the threading branch and tests can patch the copy's globals directly.
+    """
+    monkeypatch.setitem(sys.modules, "threading", None)
+    spec = importlib.util.spec_from_file_location("_fallback_event", event_module.__file__)
+    fallback = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(fallback)
+    return fallback
+
+
+def test_fallback_event_set_and_clear(monkeypatch):
+    event = _load_fallback_module(monkeypatch).Event()
+
+    assert event.is_set() is False
+    event.set()
+    assert event.is_set() is True
+    event.clear()
+    assert event.is_set() is False
+
+
+def test_fallback_event_wait_returns_immediately_when_set(monkeypatch):
+    event = _load_fallback_module(monkeypatch).Event()
+    event.set()
+
+    assert event.wait(10) is True
+
+
+def test_fallback_event_wait_times_out_when_not_set(monkeypatch):
+    fallback = _load_fallback_module(monkeypatch)
+    event = fallback.Event()
+    fake_sleep = Mock()
+    monkeypatch.setattr(fallback, "sleep", fake_sleep)
+
+    assert event.wait(0.02) is False
+    # A single sleep for the whole timeout; no thread could set the flag meanwhile
+    fake_sleep.assert_called_once_with(0.02)
+
+
+def test_fallback_event_wait_without_timeout_raises_when_not_set(monkeypatch):
+    event = _load_fallback_module(monkeypatch).Event()
+
+    with pytest.raises(RuntimeError):
+        event.wait()
+
+
+def test_fallback_event_wait_without_timeout_returns_when_set(monkeypatch):
+    event = _load_fallback_module(monkeypatch).Event()
+    event.set()
+
+    assert event.wait() is True
+
+
+def test_fallback_event_wait_honours_mock_sleep(monkeypatch, capsys):
+    event = _load_fallback_module(monkeypatch).Event()
+    monkeypatch.setattr("src.config.MOCK_SLEEP", True)
+
+    assert event.wait(0.1) is False
+    assert "Mock sleep for 0.1 seconds" in capsys.readouterr().out
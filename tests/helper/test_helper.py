@@ -1,6 +1,9 @@
-import time
+from unittest.mock import Mock
+
+import pytest
+
+import src.helper.sleep as sleep_module
 from src.helper.sleep import sleep
-from src.config import MOCK_SLEEP
 
 def test_sleep_mocked(monkeypatch, capsys):
     """Test that sleep prints mock message when MOCK_SLEEP is True and force_real is False."""
@@ -11,38 +14,31 @@ def test_sleep_mocked(monkeypatch, capsys):
     captured = capsys.readouterr()
     assert "Mock sleep for 1.0 seconds" in captured.out
 
-def test_sleep_forced_real(monkeypatch, capsys):
-    """Test that sleep actually sleeps when force_real=True."""
-    monkeypatch.setattr("src.config.MOCK_SLEEP", False)
-    start_time = time.time()
-    sleep(0.5)
-    elapsed_time = time.time() - start_time
-    assert (
-        elapsed_time >= 0.5
-    ), f"Expected at least 0.5 seconds, but got {elapsed_time} seconds"
+def test_sleep_forced_real(monkeypatch):
+    """Test that sleep actually sleeps when force_real=True, even with MOCK_SLEEP on."""
+    monkeypatch.setattr("src.config.MOCK_SLEEP", True)
+    real_sleep = Mock()
+    monkeypatch.setattr(sleep_module.time_module, "sleep", real_sleep)
+
+    sleep(0.5, force_real=True)
 
+    real_sleep.assert_called_once_with(0.5)
 
-def test_sleep_respects_mock_config():
+
+@pytest.mark.parametrize("mock_flag,expected_output", [
+    (True, "Mock sleep for 2.0 seconds"),
+    (False, None),
+])
+def test_sleep_respects_mock_config(monkeypatch, capsys, mock_flag, expected_output):
     """Test that sleep behavior depends on MOCK_SLEEP config when force_real=False."""
-    if MOCK_SLEEP:
-        # Should be mocked - test with capsys
-        def test_with_capsys(capsys):
-            sleep(2.0)
-            captured = capsys.readouterr()
-            assert "Mock sleep for 2.0 seconds" in captured.out
-
-        # Run the nested test (this is a bit awkward, see alternative below)
-        import sys
-        from io import StringIO
-
-        old_stdout = sys.stdout
-        sys.stdout = captured_output = StringIO()
-        sleep(2.0)
-        sys.stdout = old_stdout
-        assert "Mock sleep for 2.0 seconds" in captured_output.getvalue()
+    monkeypatch.setattr("src.config.MOCK_SLEEP", mock_flag)
+    real_sleep = Mock()
+    monkeypatch.setattr(sleep_module.time_module, "sleep", real_sleep)
+
+    sleep(2.0)
+
+    if expected_output is not None:
+        assert expected_output in capsys.readouterr().out
+        real_sleep.assert_not_called()
     else:
-        # Should actually sleep
-        start_time = time.time()
-        sleep(0.3)
-        elapsed_time = time.time() - start_time
-        assert elapsed_time >= 0.3
+        real_sleep.assert_called_once_with(2.0)
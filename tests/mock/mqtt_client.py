@@ -0,0 +1,12 @@
+from unittest.mock import NonCallableMock
+
+# The umqtt.simple.MQTTClient methods the ESP8266 driver uses
+MQTT_CLIENT_METHODS = [
+    'connect', 'disconnect', 'publish', 'subscribe', 'unsubscribe',
+    'set_callback', 'check_msg', 'wait_msg',
+]
+
+
+def mqtt_client_mock():
+    """Stand-in for an MQTTClient instance; unknown attributes raise instead of auto-creating."""
+    return NonCallableMock(spec_set=MQTT_CLIENT_METHODS)
@@ -0,0 +1,11 @@
+from unittest.mock import NonCallableMock
+
+# The network.WLAN interface methods available on the ESP8266 port
+WLAN_METHODS = [
+    'active', 'connect', 'disconnect', 'isconnected', 'ifconfig', 'scan', 'config',
+]
+
+
+def wlan_mock():
+    """Stand-in for a network.WLAN interface; unknown attributes raise instead of auto-creating."""
+    return NonCallableMock(spec_set=WLAN_METHODS)